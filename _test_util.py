@@ -0,0 +1,119 @@
+"""Shared helpers for Warbler tests."""
+
+from unittest import TestCase
+
+from sqlalchemy import event, text
+from sqlalchemy.engine.url import make_url
+
+from app import app
+from models import db
+
+
+def _check_test_db():
+    """Refuse to go on unless the app points at a throwaway test database.
+
+    conftest.py sets that up; running a test module any other way would
+    leave the app on the development database, which the fixtures would
+    then truncate and drop.
+    """
+
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    database = make_url(uri).database or ""
+
+    if not app.config['TESTING'] or not database.startswith("warbler_test_"):
+        raise RuntimeError(
+            f"Refusing to run tests against {uri!r}: they need TESTING on "
+            "and a warbler_test_* database. Run them with `python -m "
+            "pytest`, which sets both up in conftest.py.")
+
+
+# fail at import, before any test case can touch the database
+_check_test_db()
+
+
+def _reset_db():
+    """Empty every table in a single statement."""
+
+    # checked again here, right before the destructive statement, in case
+    # the app's config was changed after import
+    _check_test_db()
+
+    db.session.execute(text(
+        "TRUNCATE users, messages, follows, likes RESTART IDENTITY CASCADE"))
+    db.session.commit()
+
+
+class DBTestCase(TestCase):
+    """Base test case that runs every test inside a rolled-back transaction.
+
+    Each test gets its own connection with an outer transaction, and
+    db.session is bound to it inside a SAVEPOINT. Commits made by the test
+    (or by the views it calls) only release the SAVEPOINT, so rolling back
+    the outer transaction in tearDown throws away everything the test wrote.
+
+    The one session lives for the whole test: when Flask-SQLAlchemy removes
+    the session at the end of a request, it only rolls back to the
+    SAVEPOINT and empties the identity map, as a fresh session would.
+    """
+
+    # view test cases set this to one app.test_client() shared by all
+    # their tests
+    client = None
+
+    @classmethod
+    def setUpClass(cls):
+        """ Start this case from empty tables """
+
+        _reset_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Give back the connection held by class-level setup """
+
+        db.session.remove()
+
+    def setUp(self):
+        """ Bind db.session to a connection in an outer transaction """
+
+        self._engine_session = db.session
+        # give back any connection held by class-level setup
+        db.session.remove()
+
+        self.connection = db.engine.connect()
+        self.transaction = self.connection.begin()
+
+        db.session = db.create_scoped_session(
+            options={"bind": self.connection, "binds": {}})
+        db.session.begin_nested()
+
+        @event.listens_for(db.session, "after_transaction_end")
+        def restart_savepoint(session, transaction):
+            """ Re-open the SAVEPOINT whenever commit/rollback ends it """
+
+            if transaction.nested and not transaction._parent.nested:
+                session.expire_all()
+                session.begin_nested()
+
+        # A new session from the registry wouldn't have the SAVEPOINT, so a
+        # rollback in it would abort the outer transaction and let every
+        # later commit through. Never hand one out during the test.
+        session = db.session
+
+        def reset_session():
+            """ Drop uncommitted work and loaded objects, like remove() """
+
+            session.rollback()
+            session.expunge_all()
+
+        session.remove = reset_session
+
+    def tearDown(self):
+        """ Roll back everything the test wrote and forget its cookies """
+
+        if self.client is not None:
+            self.client.cookie_jar.clear()
+
+        db.session.close()
+        self.transaction.rollback()
+        self.connection.close()
+        db.session = self._engine_session
@@ -4,7 +4,9 @@ from flask import Flask, render_template, request, flash, redirect, session, g
 from flask_debugtoolbar import DebugToolbarExtension
 from sqlalchemy.exc import IntegrityError
 
-from forms import UserAddForm, LoginForm, MessageForm, UserUpdateForm, UserLogoutForm, LikeAddForm
+from forms import (
+    get_user_add_form, get_login_form, get_message_form,
+    get_user_update_form, get_user_logout_form, get_like_add_form)
 from models import db, connect_db, User, Message, Like
 
 CURR_USER_KEY = "curr_user"
@@ -22,6 +24,25 @@ app.config['SQLALCHEMY_ECHO'] = False
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', "it's a secret")
 # toolbar = DebugToolbarExtension(app)
 
+# conftest.py sets FLASK_ENV=testing before the tests import the app; use
+# bcrypt's minimum work factor there so hashing passwords doesn't dominate
+# the test run.
+app.config['TESTING'] = os.environ.get('FLASK_ENV') == 'testing'
+app.config['BCRYPT_LOG_ROUNDS'] = 4 if app.config['TESTING'] else 12
+
+if app.config['TESTING']:
+    # This is a bit of hack, but don't use Flask DebugToolbar
+    app.config['DEBUG_TB_HOSTS'] = ['dont-show-debug-toolbar']
+    app.config['DEBUG_TB_INTERCEPT_REDIRECTS'] = False
+
+    # Don't have WTForms use CSRF at all, since it's a pain to test
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    # Each test runs inside one connection's transaction, so a single
+    # pooled connection is all the suite ever needs.
+    app.config['SQLALCHEMY_POOL_SIZE'] = 1
+    app.config['SQLALCHEMY_MAX_OVERFLOW'] = 0
+
 connect_db(app)
 
 
@@ -35,7 +56,7 @@ def add_user_to_g():
 
     if CURR_USER_KEY in session:
         g.user = User.query.get(session[CURR_USER_KEY])
-        g.UserLogoutForm = UserLogoutForm()
+        g.UserLogoutForm = get_user_logout_form()()
 
     else:
         g.user = None
@@ -66,7 +87,7 @@ def signup():
     and re-present form.
     """
 
-    form = UserAddForm()
+    form = get_user_add_form()()
     if form.validate_on_submit():
         try:
             user = User.signup(
@@ -93,7 +114,7 @@ def signup():
 def login():
     """Handle user login."""
 
-    form = LoginForm()
+    form = get_login_form()()
 
     if form.validate_on_submit():
         user = User.authenticate(form.username.data,
@@ -145,7 +166,7 @@ def users_show(user_id):
     """Show user profile."""
 
     user = User.query.get_or_404(user_id)
-    form = LikeAddForm()
+    form = get_like_add_form()()
 
     return render_template('users/show.html', user=user, form=form)
 
@@ -181,7 +202,7 @@ def users_likes(user_id):
     if not g.user:
         flash("Access unauthorized.", "danger")
         return redirect("/")
-    form = LikeAddForm()
+    form = get_like_add_form()()
     user = User.query.get_or_404(user_id)
 
     return render_template('users/likes.html', user=user, form=form)
@@ -226,7 +247,7 @@ def profile():
         flash("Access unauthorized.", "danger")
         return redirect("/")
 
-    form = UserUpdateForm(obj=g.user)
+    form = get_user_update_form()(obj=g.user)
 
     if form.validate_on_submit():
         # check if password submitted on form is user's correct password
@@ -287,7 +308,7 @@ def messages_add():
         flash("Access unauthorized.", "danger")
         return redirect("/")
 
-    form = MessageForm()
+    form = get_message_form()()
 
     if form.validate_on_submit():
         msg = Message(text=form.text.data)
@@ -333,7 +354,7 @@ def likes_create_or_remove(message_id):
     """ Create a like if currently not liked. Otherwise, remove like. """
 
     message = Message.query.get(message_id)
-    form = LikeAddForm()
+    form = get_like_add_form()()
 
     # Prevent user from liking their own posts.
     if message.user_id == g.user.id:
@@ -359,7 +380,7 @@ def homepage():
     - anon users: no messages
     - logged in: 100 most recent messages of followed_users
     """
-    form = LikeAddForm()
+    form = get_like_add_form()()
 
     if g.user:
         ids = [ following_user.id for following_user in g.user.following ]
@@ -0,0 +1,96 @@
+"""pytest setup for the Warbler tests.
+
+Rather than pointing every run at one shared database, build the
+schema once in a template database and give each pytest-xdist worker its
+own copy of it (Postgres clones a template much faster than it can replay
+the DDL). Every test rolls back its own transaction, so the test modules
+can safely run in parallel.
+
+run the tests like:
+
+   python -m pytest -n auto test_*.py
+"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from models import db
+
+TEMPLATE_DB = "warbler_test_template"
+WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+TEST_DB = f"warbler_test_{WORKER or 'gw0'}"
+
+# The app reads these at import time, so they have to be set before pytest
+# imports any of the test modules.
+os.environ['DATABASE_URL'] = f"postgresql:///{TEST_DB}"
+os.environ['FLASK_ENV'] = "testing"
+
+
+def _admin_engine():
+    """Engine for the maintenance db; CREATE/DROP DATABASE can't run in a
+    transaction."""
+
+    return create_engine("postgresql:///postgres", isolation_level="AUTOCOMMIT")
+
+
+def _create_template(conn):
+    """(Re)build the template database with the current schema."""
+
+    conn.execute(f"DROP DATABASE IF EXISTS {TEMPLATE_DB}")
+    conn.execute(f"CREATE DATABASE {TEMPLATE_DB}")
+
+    engine = create_engine(f"postgresql:///{TEMPLATE_DB}")
+    db.metadata.create_all(engine)
+    # Postgres won't copy a template that still has open connections
+    engine.dispose()
+
+
+def _runs_tests(config):
+    """Does this process run tests itself? (The xdist controller doesn't.)"""
+
+    return WORKER is not None or not getattr(config.option, "numprocesses", None)
+
+
+def pytest_configure(config):
+    """Create this process's test database from the template."""
+
+    engine = _admin_engine()
+    with engine.connect() as conn:
+        # the controller (or a plain, non-xdist run) builds the template
+        # before any worker starts; workers only clone it
+        if WORKER is None:
+            _create_template(conn)
+
+        if _runs_tests(config):
+            conn.execute(f"DROP DATABASE IF EXISTS {TEST_DB}")
+            conn.execute(f"CREATE DATABASE {TEST_DB} TEMPLATE {TEMPLATE_DB}")
+    engine.dispose()
+
+
+def pytest_unconfigure(config):
+    """Drop this process's test database."""
+
+    if not _runs_tests(config):
+        return
+
+    # close the app's pooled connections so the database can be dropped
+    if db.app is not None:
+        db.engine.dispose()
+
+    engine = _admin_engine()
+    with engine.connect() as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {TEST_DB}")
+    engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _db():
+    """Make sure the tables exist once for the whole session, and drop them
+    once every test module has run."""
+
+    db.create_all()
+    yield
+    db.session.remove()
+    db.drop_all()
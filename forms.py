@@ -1,60 +1,115 @@
+from functools import lru_cache
+
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, TextAreaField
 from wtforms.validators import DataRequired, Email, Length, URL, Optional
 
+# Form classes are built on first use (and cached) rather than at import,
+# so a process only pays for the forms its routes actually render.
+
+# Email() is stateless, so every e-mail field shares this one instance.
+_email = Email()
+
+
+@lru_cache(maxsize=None)
+def get_message_form():
+    """Build form class for adding/editing messages."""
+
+    class MessageForm(FlaskForm):
+        """Form for adding/editing messages."""
+
+        text = TextAreaField('text', validators=[DataRequired()])
+
+    return MessageForm
+
+
+@lru_cache(maxsize=None)
+def _get_user_base_form():
+    """Build base form class with the fields shared by signup and login."""
+
+    class _UserBaseForm(FlaskForm):
+        """Username, e-mail and password fields."""
+
+        username = StringField('Username', validators=[DataRequired()])
+        email = StringField('E-mail', validators=[DataRequired(), _email])
+        password = PasswordField('Password', validators=[Length(min=6)])
+
+    return _UserBaseForm
+
+
+@lru_cache(maxsize=None)
+def get_user_add_form():
+    """Build form class for adding users."""
+
+    class UserAddForm(_get_user_base_form()):
+        """Form for adding users."""
+
+        image_url = StringField('(Optional) Image URL')
+
+    return UserAddForm
+
+
+@lru_cache(maxsize=None)
+def get_login_form():
+    """Build login form class."""
+
+    class LoginForm(_get_user_base_form()):
+        """Login form."""
 
-class MessageForm(FlaskForm):
-    """Form for adding/editing messages."""
+        # login only asks for username and password
+        email = None
 
-    text = TextAreaField('text', validators=[DataRequired()])
+    return LoginForm
 
 
-class UserAddForm(FlaskForm):
-    """Form for adding users."""
+@lru_cache(maxsize=None)
+def get_user_update_form():
+    """Build form class for updating users."""
 
-    username = StringField('Username', validators=[DataRequired()])
-    email = StringField('E-mail', validators=[DataRequired(), Email()])
-    password = PasswordField('Password', validators=[Length(min=6)])
-    image_url = StringField('(Optional) Image URL')
+    class UserUpdateForm(FlaskForm):
+        """ Form for updating users. """
+        username = StringField(
+            'Username',
+            validators=[DataRequired(),
+                        Length(max=30)])
+        email = StringField(
+            'E-mail',
+            validators=[DataRequired(),
+                        _email])
+        image_url = StringField(
+            'Image',
+            validators=[DataRequired()])
+        header_image_url = StringField(
+            'Header Image',
+            validators=[DataRequired()])
+        bio = StringField(
+            'Bio',
+            validators=[Optional(),
+                        Length(max=300)])
+        password = PasswordField(
+            'Enter your password',
+            validators=[DataRequired(),
+                        Length(min=6)]
+        )
 
+    return UserUpdateForm
 
-class LoginForm(FlaskForm):
-    """Login form."""
 
-    username = StringField('Username', validators=[DataRequired()])
-    password = PasswordField('Password', validators=[Length(min=6)])
+@lru_cache(maxsize=None)
+def get_user_logout_form():
+    """Build form class for user logout."""
 
+    class UserLogoutForm(FlaskForm):
+        """ Form for user logout """
 
-class UserUpdateForm(FlaskForm):
-    """ Form for updating users. """
-    username = StringField(
-        'Username',
-        validators=[DataRequired(),
-                    Length(max=30)])
-    email = StringField(
-        'E-mail',
-        validators=[DataRequired(),
-                    Email()])
-    image_url = StringField(
-        'Image',
-        validators=[DataRequired()])
-    header_image_url = StringField(
-        'Header Image',
-        validators=[DataRequired()])
-    bio = StringField(
-        'Bio',
-        validators=[Optional(),
-                    Length(max=300)])
-    password = PasswordField(
-        'Enter your password',
-        validators=[DataRequired(),
-                    Length(min=6)]
-    )
+    return UserLogoutForm
 
 
-class UserLogoutForm(FlaskForm):
-    """ Form for user logout """
+@lru_cache(maxsize=None)
+def get_like_add_form():
+    """Build form class for adding a like."""
 
+    class LikeAddForm(FlaskForm):
+        """ Form for adding a like """
 
-class LikeAddForm(FlaskForm):
-    """ Form for adding a like """
\ No newline at end of file
+    return LikeAddForm
@@ -205,3 +205,4 @@ def connect_db(app):
 
     db.app = app
     db.init_app(app)
+    bcrypt.init_app(app)
@@ -1,29 +1,10 @@
 """Message model tests."""
 
-import os
-from unittest import TestCase
-
 from models import db, User, Message, Follows, Like
+from _test_util import DBTestCase
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
-# set an environmental variable
-# to use a different database for tests (do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-# Now we can import app
-
-from app import app
-
-# Create tables (do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-db.create_all()
-
 # TODO: make a firle _test_util.py and store user data and message data there
 USER_DATA = {
     "email":"test@test.com",
@@ -32,29 +13,24 @@ USER_DATA = {
 }
 
 
-
-class MessageModelTestCase(TestCase):
+class MessageModelTestCase(DBTestCase):
     """ Tests for message model """
 
-    def setUp(self):
-        """ create test client """
-
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-        Like.query.delete()
+    @classmethod
+    def setUpClass(cls):
+        """ Add sample user and message once for all tests """
 
-        self.client = app.test_client()
+        super().setUpClass()
 
         user = User(**USER_DATA)
 
         db.session.add(user)
-        db.session.commit()
-        # TODO: again, store user_id not user instance
-        self.user = user
+        db.session.flush()
+
+        cls.user_id = user.id
 
         message_data = {
-            "user_id":self.user.id,
+            "user_id":cls.user_id,
             "text":"test"
         }
 
@@ -62,12 +38,15 @@ class MessageModelTestCase(TestCase):
         db.session.add(message)
         db.session.commit()
 
-        self.message = message
-        
-    def tearDown(self):
-        """ Clean up fouled transactions """
+        cls.message_id = message.id
 
-        db.session.rollback()
+    def setUp(self):
+        """ load sample user and message """
+
+        super().setUp()
+
+        self.user = User.query.get(self.user_id)
+        self.message = Message.query.get(self.message_id)
 
     def test_message_model(self):
         """ Does message model work? """
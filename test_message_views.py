@@ -2,67 +2,40 @@
 
 # run these tests like:
 #
-#    FLASK_ENV=production python -m unittest test_message_views.py
+#    python -m pytest test_message_views.py
 
 
-import os
-from unittest import TestCase
-
 from models import db, connect_db, Message, User
-
-# set an environmental variable
-# to use a different database for tests (do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-# Now we can import app
+from _test_util import DBTestCase
 
 from app import app, CURR_USER_KEY
 
-# This is a bit of hack, but don't use Flask DebugToolbar
-app.config['DEBUG_TB_HOSTS'] = ['dont-show-debug-toolbar']
-
-# Make Flask errors be real errors, rather than HTML pages with error info
-app.config['TESTING'] = True
-
-# Turn off debugtoolbar intercept redirects
-app.config['DEBUG_TB_INTERCEPT_REDIRECTS'] = False
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-db.create_all()
 
-# Don't have WTForms use CSRF at all, since it's a pain to test
-
-app.config['WTF_CSRF_ENABLED'] = False
-
-
-class MessageViewTestCase(TestCase):
+class MessageViewTestCase(DBTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
+    @classmethod
+    def setUpClass(cls):
+        """Create a shared test client and add sample data once."""
 
-        User.query.delete()
-        Message.query.delete()
+        super().setUpClass()
 
-        self.client = app.test_client()
-        # TODO: could make a helper function _def_user_login that gets the user and makes a POST request. Less repetitive with adding to session each time. Test login route more. Could make a helper function that makes a post request to /signup. Make requests to routes that call the methods rather than calling the methods here. 
-        new_user = User.signup(username="testuser",
-                                    email="test@test.com",
-                                    password="testuser",
-                                    image_url=None)
+        cls.client = app.test_client()
 
-        db.session.commit()
+        # TODO: could make a helper function _def_user_login that gets the user and makes a POST request. Less repetitive with adding to session each time. Test login route more. Could make a helper function that makes a post request to /signup. Make requests to routes that call the methods rather than calling the methods here. 
+        # These tests never log in with a password, so store a placeholder
+        # bcrypt-shaped hash instead of paying for User.signup to make one.
+        new_user = User(username="testuser",
+                        email="test@test.com",
+                        password="$2b$04$" + "A" * 53,
+                        image_url="/static/images/default-pic.png")
+        db.session.add(new_user)
+        db.session.flush()
 
-        self.testuser_id = new_user.id
+        cls.testuser_id = new_user.id
 
         message_data = {
-            "user_id": self.testuser_id,
+            "user_id": cls.testuser_id,
             "text": "test_message"
         }
 
@@ -71,12 +44,7 @@ class MessageViewTestCase(TestCase):
         db.session.add(message)
         db.session.commit()
 
-        self.message_id = message.id
-
-    def tearDown(self):
-        """ Clean up fouled transactions """
-
-        db.session.rollback()
+        cls.message_id = message.id
 
     def test_add_message(self):
         """Can you add a message?"""
@@ -2,88 +2,61 @@
 
 # run these tests like:
 #
-#    python -m unittest test_user_model.py
+#    python -m pytest test_user_model.py
 
 
-import os
-from unittest import TestCase
-
 from models import db, User, Message, Follows, Like
+from _test_util import DBTestCase
 from sqlalchemy.exc import IntegrityError
 from flask_bcrypt import Bcrypt
 
-# set an environmental variable
-# to use a different database for tests (do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-# Now we can import app
-
-from app import app
-
-# This is a bit of hack, but don't use Flask DebugToolbar
-app.config['DEBUG_TB_HOSTS'] = ['dont-show-debug-toolbar']
+bcrypt = Bcrypt()
 
-# Make Flask errors be real errors, rather than HTML pages with error info
-app.config['TESTING'] = True
 
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
+def make_user_data(n=1):
+    """ Return a fresh dict of data for test user `n` """
 
-db.create_all()
-bcrypt = Bcrypt()
+    return {
+        "email":f"test{n}@test.com",
+        "username":f"testuser{n}",
+        "password":f"HASHED{n}"
+    }
 
-USER_DATA = {
-    "email":"test@test.com",
-    "username":"testuser",
-    "password":"HASHED_PASSWORD"
-}
 
-USER_DATA_2 = {
-    "email":"test2@test.com",
-    "username":"testuser2",
-    "password":"HASHED_PASSWORD2"
-}
+def make_user_data_3():
+    """ Return a fresh dict of signup data for a third test user """
 
+    data = make_user_data(3)
+    data["image_url"] = User.image_url.default.arg
+    return data
 
-USER_DATA_3 = {
-    "email":"test3@test.com",
-    "username":"testuser3",
-    "password":"HASHED_PASSWORD3",
-    "image_url": User.image_url.default.arg
-}
 
-class UserModelTestCase(TestCase):
+class UserModelTestCase(DBTestCase):
     """Tests for user model."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-        Like.query.delete()
+    @classmethod
+    def setUpClass(cls):
+        """Add sample data once for all tests."""
 
-        self.client = app.test_client()
+        super().setUpClass()
 
-        u = User(**USER_DATA)
-        u2 = User(**USER_DATA_2)
+        u = User(**make_user_data(1))
+        u2 = User(**make_user_data(2))
 
-        
         db.session.add(u)
         db.session.add(u2)
         db.session.commit()
-        # TODO: change this to storing self.user_id instead of the instance itself
-        self.user = u
-        self.user2 = u2
 
-    def tearDown(self):
-        """ Clean up fouled transactions """
+        cls.user_id = u.id
+        cls.user2_id = u2.id
+
+    def setUp(self):
+        """Load sample data."""
 
-        db.session.rollback()
+        super().setUp()
+
+        self.user = User.query.get(self.user_id)
+        self.user2 = User.query.get(self.user2_id)
 
     def test_user_model(self):
         """Does basic model work?"""
@@ -95,7 +68,7 @@ class UserModelTestCase(TestCase):
         self.assertEqual(len(self.user.liked_messages), 0)
         self.assertEqual(
             str(self.user), 
-            f"<User #{self.user.id}: testuser, test@test.com>")
+            f"<User #{self.user.id}: testuser1, test1@test.com>")
 
     def test_user_is_following(self):
         """ Does is_following successfully detect when user1 is following 
@@ -126,7 +99,7 @@ class UserModelTestCase(TestCase):
         """ Does User.signup() successfuly create a new user given valid 
         credentials """
 
-        new_user = User.signup(**USER_DATA_3)
+        new_user = User.signup(**make_user_data_3())
         db.session.commit()
 
         self.assertIsInstance(new_user.id, int)
@@ -136,43 +109,46 @@ class UserModelTestCase(TestCase):
         """ Does User.signup() fail to create a new user given invalid 
         credentials """
 
+        data = make_user_data_3()
+
         # check that signup fails if non-nullable argument is not passed in
-        USER_DATA_3.pop('username')
+        data.pop('username')
         # TODO: note that we can also do try/ except in tests
         with self.assertRaises(TypeError):
-            new_user = User.signup(**USER_DATA_3)
+            new_user = User.signup(**data)
 
         self.assertEqual(User.query.count(), 2)
 
         # check that signup fails if unique validation fails
-        USER_DATA_3['username'] = USER_DATA['username']
+        data['username'] = make_user_data(1)['username']
+        # the failed INSERT only aborts this SAVEPOINT (rolled back as the
+        # error leaves the block), not the rest of the test's transaction
         with self.assertRaises(IntegrityError):
-            new_user = User.signup(**USER_DATA_3)
-            db.session.commit()
-
-        # in a transaction, if one fails, all after will fails, can be reset with db.session.rollback()
-        db.session.rollback()
+            with db.session.begin_nested():
+                new_user = User.signup(**data)
+                db.session.flush()
 
         self.assertEqual(User.query.count(), 2)
 
     def test_user_authenticate(self):
         """ Test if User.authenticate return a user when given a valid username and password and return false when passing in invalid username/password"""
 
-        original_pw = USER_DATA_3['password']
-        USER_DATA_3['password'] = bcrypt.generate_password_hash(
-            USER_DATA_3['password']).decode('UTF-8')
-        new_user = User(**USER_DATA_3)
+        data = make_user_data_3()
+        original_pw = data['password']
+        data['password'] = bcrypt.generate_password_hash(
+            data['password'], 4).decode('UTF-8')
+        new_user = User(**data)
 
         db.session.add(new_user)
         db.session.commit()
 
         # Test if successfully authenticate by passing valid username and password 
         self.assertEqual(
-            User.authenticate(USER_DATA_3['username'], original_pw), new_user)
+            User.authenticate(data['username'], original_pw), new_user)
 
         # Test if failed to authenticate by passing invalid password 
         self.assertFalse(
-            User.authenticate(USER_DATA_3['username'], 'testuser2')
+            User.authenticate(data['username'], 'testuser2')
         )
 
         # Test if failed to authenticate by passing invalid username
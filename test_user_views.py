@@ -2,58 +2,26 @@
 
 # run these tests like:
 #
-#    FLASK_ENV=production python -m unittest test_user_views.py
+#    python -m pytest test_user_views.py
 
 
-import os
-from unittest import TestCase
-
 from models import db, connect_db, Message, User, Follows, Like
-
-
-# BEFORE we import our app, set an environmental variable
-# to use a different database for tests (do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-# Now we can import app
+from _test_util import DBTestCase
 
 from app import app, CURR_USER_KEY
 
-# This is a bit of hack, but don't use Flask DebugToolbar
-app.config['DEBUG_TB_HOSTS'] = ['dont-show-debug-toolbar']
-
-# Make Flask errors be real errors, rather than HTML pages with error info
-app.config['TESTING'] = True
-
-# Turn off debugtoolbar intercept redirects
-app.config['DEBUG_TB_INTERCEPT_REDIRECTS'] = False
 
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-db.create_all()
-
-# Don't have WTForms use CSRF at all, since it's a pain to test
-
-app.config['WTF_CSRF_ENABLED'] = False
-
-
-class UserViewTestCase(TestCase):
+class UserViewTestCase(DBTestCase):
     """Test views for users."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
+    @classmethod
+    def setUpClass(cls):
+        """Create a shared test client and add sample users once."""
+
+        super().setUpClass()
 
-        Follows.query.delete()
-        Like.query.delete()
-        User.query.delete()
-        Message.query.delete()
+        cls.client = app.test_client()
 
-        self.client = app.test_client()
         #  TODO: helper function that calls user.signup
         new_user = User.signup(
             username="testuser",
@@ -69,13 +37,16 @@ class UserViewTestCase(TestCase):
 
         db.session.commit()
 
-        self.testuser_id = new_user.id
-        self.testuser2_id = new_user_2.id
+        cls.testuser_id = new_user.id
+        cls.testuser2_id = new_user_2.id
 
-    def tearDown(self):
-        """ Clean up fouled transactions """
-
-        db.session.rollback()
+        # keep detached, fully loaded copies around: tests read fields off
+        # them directly, and merge them into their own session only when
+        # they need an attached instance (e.g. to change follows)
+        cls.testuser = User.query.get(cls.testuser_id)
+        cls.testuser2 = User.query.get(cls.testuser2_id)
+        db.session.expunge(cls.testuser)
+        db.session.expunge(cls.testuser2)
 
     def test_users_following(self):
         """ When you’re logged in, can you see the following pages for any user? """
@@ -84,8 +55,8 @@ class UserViewTestCase(TestCase):
             with c.session_transaction() as sess:
                 sess[CURR_USER_KEY] = self.testuser2_id
 
-        user = User.query.get(self.testuser_id)
-        user2 = User.query.get(self.testuser2_id)
+        user = db.session.merge(self.testuser, load=False)
+        user2 = db.session.merge(self.testuser2, load=False)
         user.following.append(user2)
         db.session.commit()
        
@@ -98,8 +69,8 @@ class UserViewTestCase(TestCase):
     def test_users_following_logged_out(self):
         """ When no user is logged in, check that you can't see the following pages for any user.""" 
 
-        user = User.query.get(self.testuser_id)
-        user2 = User.query.get(self.testuser2_id)
+        user = db.session.merge(self.testuser, load=False)
+        user2 = db.session.merge(self.testuser2, load=False)
         user.following.append(user2)
         db.session.commit()
        
@@ -119,8 +90,8 @@ class UserViewTestCase(TestCase):
             with c.session_transaction() as sess:
                 sess[CURR_USER_KEY] = self.testuser2_id
 
-        user = User.query.get(self.testuser_id)
-        user2 = User.query.get(self.testuser2_id)
+        user = db.session.merge(self.testuser, load=False)
+        user2 = db.session.merge(self.testuser2, load=False)
         user.followers.append(user2)
         db.session.commit()
        
@@ -133,8 +104,8 @@ class UserViewTestCase(TestCase):
     def test_users_followers_logged_out(self):
         """ When no user is logged in, check that you can't see the followers pages for any user.""" 
 
-        user = User.query.get(self.testuser_id)
-        user2 = User.query.get(self.testuser2_id)
+        user = db.session.merge(self.testuser, load=False)
+        user2 = db.session.merge(self.testuser2, load=False)
         user.followers.append(user2)
         db.session.commit()
        
@@ -150,7 +121,7 @@ class UserViewTestCase(TestCase):
     def test_login(self):
         """ Test login successfully works """
 
-        user = User.query.get(self.testuser_id)
+        user = self.testuser
 
         with self.client as c:
             resp = c.post(
@@ -169,7 +140,7 @@ class UserViewTestCase(TestCase):
     def test_login_fail(self):
         """ Test login does not work with invalid credentials """
 
-        user = User.query.get_or_404(self.testuser_id)
+        user = self.testuser
 
         with self.client as c:
             resp = c.post(
@@ -201,7 +172,7 @@ class UserViewTestCase(TestCase):
     def test_user_profile(self):
         """ Test successful update profile """
 
-        user = User.query.get(self.testuser_id)
+        user = self.testuser
 
         with self.client as c:
             with c.session_transaction() as sess:
@@ -226,7 +197,7 @@ class UserViewTestCase(TestCase):
     def test_user_profile_invalid_cred(self):
         """ Test that you cannot update user profile with wrong password """
 
-        user = User.query.get(self.testuser_id)
+        user = self.testuser
 
         with self.client as c:
             with c.session_transaction() as sess:
@@ -251,7 +222,7 @@ class UserViewTestCase(TestCase):
     def test_user_profile_logged_out(self):
         """ Test that you cannot update user profile if you are logged out """
 
-        user = User.query.get(self.testuser_id)
+        user = self.testuser
 
         with self.client as c:
 
@@ -274,7 +245,7 @@ class UserViewTestCase(TestCase):
     def test_user_profile_invalid_form(self):
         """ Test that the user will not be updated with invalid form submission"""
 
-        user = User.query.get_or_404(self.testuser_id)
+        user = self.testuser
 
         with self.client as c:
             with c.session_transaction() as sess:
@@ -296,7 +267,8 @@ class UserViewTestCase(TestCase):
             self.assertEqual(resp.status_code, 200)
             self.assertIn(f"{user.image_url}", html)
         
-            user = User.query.get_or_404(self.testuser_id)
+            # re-read the stored row, not whatever the session has cached
+            user = User.query.populate_existing().get(self.testuser_id)
             # check that username is equal to original username. Want tests to be more specific 
             self.assertNotEqual(user.username, "")
 
@@ -328,4 +300,36 @@ class UserViewTestCase(TestCase):
             # TODO: check the session
             # from flask import session, then check if curr user key is in the session
             self.assertEqual(resp.status_code, 200)
-            self.assertIn("Access unauthorized", html)
\ No newline at end of file
+            self.assertIn("Access unauthorized", html)
+
+    def test_failed_signup_does_not_leak_later_commits(self):
+        """ Test that a rollback after a request doesn't let the test's
+        later commits escape its transaction """
+
+        with self.client as c:
+            c.get("/signup")
+
+            # duplicate username: the route's commit fails and is rolled back
+            resp = c.post(
+                    "/signup",
+                    data={
+                        "username":"testuser",
+                        "email":"other@test.com",
+                        "password":"password",
+                        })
+            self.assertIn("Username already taken", resp.get_data(as_text=True))
+
+            resp = c.post(
+                    "/signup",
+                    data={
+                        "username":"leaked",
+                        "email":"leaked@test.com",
+                        "password":"password",
+                        })
+            self.assertEqual(resp.status_code, 302)
+
+        # start over as the next test would
+        self.tearDown()
+        self.setUp()
+
+        self.assertEqual(User.query.filter_by(username="leaked").count(), 0)